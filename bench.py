@@ -0,0 +1,274 @@
+"""
+Offline benchmarks for the pledge hot paths.
+
+    python bench.py micro --sizes 1000 10000 100000
+    python bench.py http --seed 1000 --clients 16 --requests 25 --viewers 20
+    python bench.py all
+
+Everything runs against temporary output folders; results are written as
+JSON (--out) so runs can be compared for regressions.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+def seed_pledge_files(folder, count, value=20):
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        (folder / f"pledge_{i}.txt").write_text(f"seed{i}@example.com, {value}", encoding="utf-8")
+
+def summarize(samples):
+    """
+    Latency summary in milliseconds.
+    """
+    ordered = sorted(samples)
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+    return {
+        "n": len(ordered),
+        "p50_ms": pct(50),
+        "p99_ms": pct(99),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "min_ms": ordered[0] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def run_micro(sizes, repeat, workdir):
+    # main reads style.css relative to the cwd and opens storage at import
+    os.chdir(HERE)
+    os.environ["PLEDGE_OUTPUT_DIR"] = str(Path(workdir) / "import")
+    import main
+    import storage
+
+    results = []
+    for size in sizes:
+        folder = Path(workdir) / f"micro_{size}"
+        seed_pledge_files(folder, size)
+        result = {"pledges": size}
+
+        result["sum_values_from_files"] = summarize(timed(lambda: storage.sum_values_from_files(folder), repeat))
+
+        start = time.perf_counter()
+        storage.save_indexed_texts(["cold@example.com, 20"], folder)
+        result["save_indexed_texts_cold_ms"] = (time.perf_counter() - start) * 1000
+        result["save_indexed_texts"] = summarize(
+            timed(lambda: storage.save_indexed_texts(["warm@example.com, 20"], folder), repeat)
+        )
+
+        for kind in ("files", "log", "sqlite"):
+            # A folder of its own, so no backend sees the others' writes or migrates them
+            kind_folder = Path(workdir) / f"micro_{size}_{kind}"
+            seed_pledge_files(kind_folder, size)
+            # The first open migrates the seeded files (or builds the aggregate
+            # for "files"); reopening then shows the steady-state startup cost
+            with contextlib.redirect_stdout(sys.stderr):
+                start = time.perf_counter()
+                storage.open_storage(kind, kind_folder)
+                result[f"migrate_{kind}_ms"] = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            backend = storage.open_storage(kind, kind_folder)
+            result[f"open_{kind}_ms"] = (time.perf_counter() - start) * 1000
+            # Point main's module-level handles at this backend and call the real submit()
+            main.storage = backend
+            main.submissions = storage.SubmissionQueue(backend)
+            main.feed = main.ChangeFeed(backend, main.render_progress)
+            emails = (f"bench{i}@example.com" for i in itertools.count())
+            result[f"submit_{kind}"] = summarize(timed(lambda: main.submit(next(emails), 20), repeat))
+            shutil.rmtree(kind_folder)
+
+        results.append(result)
+        print(f"micro {size}: {json.dumps(result)}", file=sys.stderr)
+        shutil.rmtree(folder)
+    return results
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_for(url, timeout=120):
+    import httpx
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"server did not come up at {url}")
+
+def run_http(seed, clients, requests, viewers, mode, kind, workdir):
+    from gradio_client import Client
+
+    sys.path.insert(0, str(HERE))
+    import storage
+
+    folder = Path(workdir) / "http"
+    seed_pledge_files(folder, seed)
+    port, progress_port = free_port(), free_port()
+    form_url = f"http://127.0.0.1:{port}/"
+    progress_url = f"http://127.0.0.1:{port}/progress/" if mode == "single" else f"http://127.0.0.1:{progress_port}/"
+    env = dict(
+        os.environ,
+        PLEDGE_OUTPUT_DIR=str(folder),
+        PLEDGE_STORAGE=kind,
+        PORT=str(port),
+        PROGRESS_PORT=str(progress_port),
+        SERVER_MODE=mode,
+        WORKERS="1",
+        # Every simulated client comes from 127.0.0.1
+        SUBMIT_RATE_PER_MIN="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=HERE, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        start = time.perf_counter()
+        wait_for(form_url)
+        wait_for(progress_url)
+        startup_s = time.perf_counter() - start
+
+        expected_total = seed * 20.0 + clients * requests * 20.0
+        seen = [[] for _ in range(viewers)]
+        viewer_jobs = []
+        for i in range(viewers):
+            job = Client(progress_url, verbose=False).submit(api_name="/progress")
+            viewer_jobs.append(job)
+
+        def watch(i, job):
+            for amount, _, _ in job:
+                seen[i].append((time.perf_counter(), amount))
+                if amount == f"{expected_total}€":
+                    return
+
+        watchers = [threading.Thread(target=watch, args=(i, job), daemon=True) for i, job in enumerate(viewer_jobs)]
+        for watcher in watchers:
+            watcher.start()
+
+        latencies = []
+        errors = []
+        submit_clients = [Client(form_url, verbose=False) for _ in range(clients)]
+
+        def hammer(n, client):
+            for i in range(requests):
+                t0 = time.perf_counter()
+                try:
+                    # Distinct emails, so the sqlite backend's dedup does not merge them
+                    client.predict(f"load{n}-{i}@example.com", 20, api_name="/submit")
+                except Exception as exc:
+                    errors.append(repr(exc))
+                    continue
+                latencies.append(time.perf_counter() - t0)
+
+        threads = [threading.Thread(target=hammer, args=(n, client)) for n, client in enumerate(submit_clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        finished = time.perf_counter()
+        wall = finished - start
+
+        for watcher in watchers:
+            watcher.join(timeout=30)
+        for job in viewer_jobs:
+            job.cancel()
+        # Time from the last submission returning until each viewer showed the
+        # final total; negative when the push beat the submitter's own reply
+        propagation = [
+            updates[-1][0] - finished
+            for updates in seen
+            if updates and updates[-1][1] == f"{expected_total}€"
+        ]
+
+        backend = storage.open_storage(kind, folder)
+        expected = seed + clients * requests
+        return {
+            "mode": mode,
+            "storage": kind,
+            "seed": seed,
+            "clients": clients,
+            "requests_per_client": requests,
+            "viewers": viewers,
+            "startup_s": startup_s,
+            "submit": summarize(latencies) if latencies else None,
+            "throughput_rps": len(latencies) / wall,
+            "errors": len(errors),
+            "error_samples": errors[:5],
+            "expected_pledges": expected,
+            "stored_pledges": backend.count(),
+            "lost_writes": expected - backend.count(),
+            "stored_total": backend.total(),
+            "expected_total": expected_total,
+            "viewers_reached_final_total": len(propagation),
+            "viewer_updates_mean": statistics.fmean(len(updates) for updates in seen) if seen else 0,
+            "viewer_propagation": summarize(propagation) if propagation else None,
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pledge submit and progress paths.")
+    parser.add_argument("suite", choices=["micro", "http", "all"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="micro: pledge files to pre-seed")
+    parser.add_argument("--repeat", type=int, default=20, help="micro: calls per measurement")
+    parser.add_argument("--seed", type=int, default=1000, help="http: pledge files to pre-seed")
+    parser.add_argument("--clients", type=int, default=16, help="http: concurrent submitters")
+    parser.add_argument("--requests", type=int, default=25, help="http: submissions per submitter")
+    parser.add_argument("--viewers", type=int, default=20, help="http: simulated progress pages")
+    parser.add_argument("--mode", choices=["dual", "single"], default="single", help="http: SERVER_MODE")
+    parser.add_argument("--storage", choices=["sqlite", "log", "files"], default="sqlite", help="http: PLEDGE_STORAGE")
+    parser.add_argument("--out", default="bench_output.json", help="where to write the JSON results")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+    }
+    out = Path(args.out).resolve()
+    workdir = tempfile.mkdtemp(prefix="pledge-bench-")
+    try:
+        if args.suite in ("micro", "all"):
+            results["micro"] = run_micro(args.sizes, args.repeat, workdir)
+        if args.suite in ("http", "all"):
+            results["http"] = run_http(
+                args.seed, args.clients, args.requests, args.viewers, args.mode, args.storage, workdir,
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+import traceback
+
+class ChangeFeed:
+    """
+    Publishes the pledge total to every connected progress page.
+
+    One poller thread per process asks the storage for its total (a cheap
+    stat for the log and file backends) and only renders and publishes
+    when it changed, so idle pages cost nothing. Submissions made in this
+    process publish directly and show up without waiting for a poll.
+    """
+
+    def __init__(self, storage, render, interval=1.0):
+        self.storage = storage
+        self.render = render
+        self.interval = interval
+        self.version = 0
+        self.payload = None
+        self._total = None
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+
+    def publish(self, total):
+        with self._lock:
+            if total == self._total:
+                return
+            self._total = total
+            self.payload = self.render(total)
+            self.version += 1
+            subscribers = list(self._subscribers)
+        for loop, event in subscribers:
+            loop.call_soon_threadsafe(event.set)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._poll, name="pledge-feed", daemon=True)
+            self._thread.start()
+
+    def refresh(self):
+        """
+        Read the storage total and publish it if it changed. Blocks on storage.
+        """
+        self.publish(self.storage.total())
+
+    def _poll(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                traceback.print_exc()
+            time.sleep(self.interval)
+
+    async def stream(self, heartbeat):
+        """
+        Yield the current payload, then each new one as it is published.
+        Yields None after `heartbeat` seconds without a change.
+        """
+        if self.payload is None:
+            # Storage reads block; keep them off the event loop
+            await asyncio.to_thread(self.refresh)
+        self.start()
+        subscriber = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            version = None
+            while True:
+                # Clear before checking, so a publish from here on still wakes
+                # us and a stale wake-up for a version we already sent does not
+                subscriber[1].clear()
+                if self.version != version:
+                    version, payload = self.version, self.payload
+                    yield payload
+                    continue
+                try:
+                    await asyncio.wait_for(subscriber[1].wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
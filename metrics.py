@@ -0,0 +1,173 @@
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from functools import wraps
+
+# Off unless PLEDGE_METRICS is set; timed() then returns functions unwrapped
+ENABLED = os.environ.get("PLEDGE_METRICS", "0").lower() in ("1", "true", "yes")
+# Profile a sample of calls to profile=True functions and print the ones slower than this
+PROFILE_SLOW_MS = float(os.environ.get("PLEDGE_PROFILE_SLOW_MS", "0"))
+PROFILE_RATE = float(os.environ.get("PLEDGE_PROFILE_RATE", "0.1"))
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FILES_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+REGISTRY = []
+
+def _format(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1):
+        if not ENABLED:
+            return
+        with self._lock:
+            self.value += amount
+
+    def render(self):
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {_format(self.value)}",
+        ]
+
+class Gauge:
+    """
+    Value read from a callback at scrape time.
+    """
+
+    def __init__(self, name, help, callback):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        REGISTRY.append(self)
+
+    def render(self):
+        try:
+            value = _format(self.callback())
+        except Exception:
+            value = "NaN"
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {value}",
+        ]
+
+class Histogram:
+    """
+    Prometheus histogram with an optional single label.
+    """
+
+    def __init__(self, name, help, buckets, label=None):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.label = label
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, label_value=""):
+        if not ENABLED:
+            return
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_value, (counts, total, count) in series:
+            labels = f'{self.label}="{label_value}",' if self.label else ""
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels}le="{_format(bound)}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{labels}le="+Inf"}} {count}')
+            suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {_format(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+CALL_DURATION = Histogram(
+    "pledge_call_duration_seconds", "Time spent in instrumented pledge functions.", LATENCY_BUCKETS, label="function",
+)
+FILES_READ = Histogram(
+    "pledge_aggregation_files_read", "Files read by one aggregation pass.", FILES_BUCKETS,
+)
+SUBMISSIONS = Counter("pledge_submissions_total", "Pledges submitted through the form or API.")
+REJECTED = Counter("pledge_submissions_rejected_total", "Submissions refused by validation or rate limiting.")
+QUARANTINED = Counter("pledge_records_quarantined_total", "Unreadable pledge records set aside during aggregation.")
+
+def _report_profile(profiler, name, elapsed):
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+    print(f"Slow call: {name} took {elapsed * 1000:.1f} ms\n{out.getvalue()}", file=sys.stderr)
+
+def timed(fn=None, *, profile=False):
+    """
+    Record the call duration of fn in CALL_DURATION.
+
+    With profile=True and PLEDGE_PROFILE_SLOW_MS set, a PLEDGE_PROFILE_RATE
+    share of calls also runs under cProfile, and the stats of any call
+    slower than the threshold are printed to stderr.
+    """
+    if fn is None:
+        return lambda fn: timed(fn, profile=profile)
+    profile = profile and PROFILE_SLOW_MS > 0
+    if not ENABLED and not profile:
+        return fn
+    name = fn.__qualname__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        profiler = None
+        if profile and random.random() < PROFILE_RATE:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another thread is already profiling
+                profiler = None
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            CALL_DURATION.observe(elapsed, name)
+            if profiler is not None:
+                profiler.disable()
+                if elapsed * 1000 >= PROFILE_SLOW_MS:
+                    _report_profile(profiler, name, elapsed)
+    return wrapper
+
+def render():
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+def add_metrics_route(app):
+    """
+    Expose /metrics on a FastAPI app when metrics are enabled.
+    """
+    if not ENABLED:
+        return
+    from fastapi import Response
+
+    def serve_metrics():
+        return Response(render(), media_type="text/plain; version=0.0.4")
+    app.add_api_route("/metrics", serve_metrics, methods=["GET"])
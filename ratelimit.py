@@ -0,0 +1,37 @@
+import threading
+import time
+from collections import OrderedDict
+
+class RateLimiter:
+    """
+    Token bucket per client key.
+
+    Each key may spend `burst` tokens at once, refilled at `rate` tokens per
+    second. At most `max_clients` buckets are kept; the least recently used
+    one is dropped first, and an idle bucket would be full again anyway.
+    """
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        """
+        Take one token for key.
+        Returns:
+            True if the call may go ahead
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return allowed
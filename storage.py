@@ -0,0 +1,837 @@
+import argparse
+import csv
+import json
+import math
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+
+import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process locks apply
+    fcntl = None
+
+OUTPUT_DIR = os.environ.get("PLEDGE_OUTPUT_DIR", "./output")
+STORAGE_KIND = os.environ.get("PLEDGE_STORAGE", "sqlite")
+LOG_NAME = "pledges.jsonl"
+DB_NAME = "pledges.sqlite3"
+# Unreadable pledge files are moved here, inside the output folder
+QUARANTINE_DIR = "quarantine"
+# Width in euros of the amount buckets kept by SQLiteStorage
+HISTOGRAM_BUCKET = 50
+
+def parse_pledge_line(line, name="<text>"):
+    """
+    Parse a single "email,value" line.
+    Returns:
+        (email, value) tuple, or None for an empty line
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        # The value never contains a comma, the email might
+        email, value = line.rsplit(",", 1)
+        value = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid format in {name}: {line}")
+    if not math.isfinite(value):
+        raise ValueError(f"Invalid value in {name}: {line}")
+    return email.strip(), value
+
+def format_pledge_line(email, value):
+    return f"{email}, {value}"
+
+def quarantine_file(path, error):
+    """
+    Move an unreadable pledge file out of the way so it no longer breaks
+    aggregation.
+    """
+    path = Path(path)
+    target = path.parent / QUARANTINE_DIR
+    target.mkdir(exist_ok=True)
+    # Keep an earlier file of the same name, e.g. from before a reset
+    destination = target / path.name
+    suffix = 0
+    while destination.exists():
+        suffix += 1
+        destination = target / f"{path.name}.{suffix}"
+    try:
+        path.replace(destination)
+    except FileNotFoundError:
+        return  # another process got to it first
+    metrics.QUARANTINED.inc()
+    print(f"Quarantined {path} as {destination}: {error}", file=sys.stderr)
+
+def normalize_email(email):
+    """
+    Dedup key for an email: trimmed and lowercased, None when empty.
+    """
+    email = (email or "").strip().lower()
+    return email or None
+
+@contextmanager
+def _flock(fd):
+    """
+    Hold an exclusive flock on fd so writers in other processes wait their turn.
+    """
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+@metrics.timed
+def sum_values_from_files(folder):
+    """
+    Read all files in a folder.
+    Each file must contain a single line: email,value
+    Returns:
+        total_sum (float)
+    """
+    folder = Path(folder)
+    total = 0.0
+    files_read = 0
+    for path in folder.iterdir():
+        if not path.is_file():
+            continue
+        files_read += 1
+        try:
+            pledge = parse_pledge_line(path.read_text(encoding="utf-8"), path.name)
+        except ValueError as error:
+            print(f"Skipping {path}: {error}", file=sys.stderr)
+            continue
+        if pledge is not None:
+            total += pledge[1]
+    metrics.FILES_READ.observe(files_read)
+    return total
+
+class PledgeAggregate:
+    """
+    Running total, count and highest index of the pledge files in a folder.
+
+    Built from disk once, then updated in place by save_indexed_texts.
+    Files added or removed by someone else change the folder mtime,
+    which triggers a full rebuild on the next read. Files that were still
+    empty at the last rebuild are watched too, since writing into them
+    does not touch the folder.
+    """
+
+    def __init__(self, folder, prefix="pledge", extension=".txt"):
+        self.folder = Path(folder)
+        self.pattern = re.compile(rf"^{re.escape(prefix)}_(\d+){re.escape(extension)}$")
+        self.lock = threading.RLock()
+        self.total = 0.0
+        self.count = 0
+        self.max_index = -1
+        self._mtime_ns = None
+        self._empty = {}
+
+    def _folder_mtime(self):
+        try:
+            return self.folder.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @metrics.timed
+    def rebuild(self):
+        with self.lock:
+            # Take the mtime first so a file landing mid-scan forces another rebuild
+            mtime = self._folder_mtime()
+            total, count, max_index = 0.0, 0, -1
+            empty = {}
+            files_read = 0
+            if mtime is not None:
+                for path in self.folder.iterdir():
+                    match = self.pattern.match(path.name)
+                    if not match or not path.is_file():
+                        continue
+                    files_read += 1
+                    max_index = max(max_index, int(match.group(1)))
+                    try:
+                        mtime_ns = path.stat().st_mtime_ns
+                        pledge = parse_pledge_line(path.read_text(encoding="utf-8"), path.name)
+                    except FileNotFoundError:
+                        continue
+                    except ValueError as error:
+                        quarantine_file(path, error)
+                        continue
+                    if pledge is not None:
+                        total += pledge[1]
+                        count += 1
+                    else:
+                        empty[path] = mtime_ns
+            self.total, self.count, self.max_index = total, count, max_index
+            self._mtime_ns = mtime
+            self._empty = empty
+            metrics.FILES_READ.observe(files_read)
+
+    def _empty_changed(self):
+        for path, mtime_ns in self._empty.items():
+            try:
+                if path.stat().st_mtime_ns != mtime_ns:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+    def refresh(self):
+        """
+        Rebuild if the folder, or a file that was empty, changed behind our back.
+        """
+        with self.lock:
+            if self._mtime_ns is None or self._folder_mtime() != self._mtime_ns or self._empty_changed():
+                self.rebuild()
+
+    def record(self, index, value):
+        """
+        Account for a file we have just written ourselves.
+        """
+        with self.lock:
+            if value is not None:
+                self.total += value
+                self.count += 1
+            self.max_index = max(self.max_index, index)
+            self._mtime_ns = self._folder_mtime()
+
+    def current_total(self):
+        with self.lock:
+            self.refresh()
+            return self.total
+
+_aggregates = {}
+_aggregates_lock = threading.Lock()
+
+def get_aggregate(folder, prefix="pledge", extension=".txt"):
+    """
+    Process-wide PledgeAggregate for a folder, built on first use.
+    """
+    key = (str(Path(folder).resolve()), prefix, extension)
+    with _aggregates_lock:
+        aggregate = _aggregates.get(key)
+        if aggregate is None:
+            aggregate = _aggregates[key] = PledgeAggregate(folder, prefix, extension)
+            aggregate.rebuild()
+    return aggregate
+
+@metrics.timed
+def save_indexed_texts(texts, folder, prefix="pledge", extension=".txt"):
+    """
+    Save text strings as index-numbered files, continuing from
+    the highest existing index in the folder.
+
+    Existing files must match: {prefix}_{index}{extension}
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    aggregate = get_aggregate(folder, prefix, extension)
+    # Locking the folder keeps other processes from slipping a file in
+    # between our refresh and the mtime that record() stamps
+    folder_fd = os.open(folder, os.O_RDONLY)
+    try:
+        with aggregate.lock, _flock(folder_fd):
+            aggregate.refresh()
+            index = aggregate.max_index + 1
+            # Written in full under a name the pattern skips, then linked into
+            # place, so no reader ever sees a pledge file without its contents
+            scratch = folder / f".{prefix}_{os.getpid()}_{threading.get_ident()}.tmp"
+            for text in texts:
+                scratch.write_text(text, encoding="utf-8")
+                try:
+                    # link() fails if the name exists: if someone outside the
+                    # lock took this index, use the next one
+                    while True:
+                        try:
+                            os.link(scratch, folder / f"{prefix}_{index}{extension}")
+                            break
+                        except FileExistsError:
+                            index += 1
+                finally:
+                    scratch.unlink()
+                pledge = parse_pledge_line(text, f"{prefix}_{index}{extension}")
+                aggregate.record(index, pledge[1] if pledge else None)
+                index += 1
+    finally:
+        os.close(folder_fd)
+
+def iter_pledge_files(folder, prefix="pledge", extension=".txt"):
+    """
+    Yield (index, email, value) for every pledge file in a folder, by index.
+    """
+    folder = Path(folder)
+    pattern = re.compile(rf"^{re.escape(prefix)}_(\d+){re.escape(extension)}$")
+    indexed = []
+    for path in folder.iterdir():
+        match = pattern.match(path.name)
+        if match and path.is_file():
+            indexed.append((int(match.group(1)), path))
+    for index, path in sorted(indexed):
+        try:
+            pledge = parse_pledge_line(path.read_text(encoding="utf-8"), path.name)
+        except ValueError as error:
+            print(f"Skipping {path}: {error}", file=sys.stderr)
+            continue
+        if pledge is not None:
+            yield (index,) + pledge
+
+class DirectoryStorage:
+    """
+    One pledge_{index}.txt file per pledge, the original layout.
+    """
+
+    def __init__(self, folder=OUTPUT_DIR):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.aggregate = get_aggregate(self.folder)
+
+    def add_many(self, pledges):
+        """
+        Store (email, value) pairs and return the new total.
+        """
+        save_indexed_texts([format_pledge_line(email, value) for email, value in pledges], self.folder)
+        return self.total()
+
+    def add(self, email, value):
+        return self.add_many([(email, value)])
+
+    def total(self):
+        return self.aggregate.current_total()
+
+    def count(self):
+        with self.aggregate.lock:
+            self.aggregate.refresh()
+            return self.aggregate.count
+
+    def records(self):
+        return iter_pledge_files(self.folder)
+
+class LogStorage:
+    """
+    Append-only JSON lines log, one {"index", "email", "value"} record per line.
+
+    A batch of pledges is written with a single write and fsync. The total
+    and count are kept in memory and caught up by reading only the bytes
+    appended since the last read, so other writers are picked up cheaply.
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self.fsync = fsync
+        self.lock = threading.RLock()
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self._total = 0.0
+        self._count = 0
+        self._next_index = 0
+        self._offset = 0
+        self._inode = None
+
+    @metrics.timed
+    def refresh(self):
+        """
+        Read any records appended since the last call.
+        """
+        with self.lock:
+            stat = self.path.stat()
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                # Replaced or truncated: start over
+                self._reset()
+                self._inode = stat.st_ino
+            if stat.st_size == self._offset:
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read(stat.st_size - self._offset)
+            # Leave a half-written trailing line for the next call
+            end = chunk.rfind(b"\n") + 1
+            position = self._offset
+            for line in chunk[:end].split(b"\n")[:-1]:
+                offset, position = position, position + len(line) + 1
+                if not line.strip():
+                    continue
+                record = self._parse(line)
+                if record is None:
+                    self._quarantine(line, offset)
+                    continue
+                self._total += record["value"]
+                self._count += 1
+                self._next_index = max(self._next_index, record["index"] + 1)
+            self._offset += end
+
+    @staticmethod
+    def _parse(line):
+        """
+        Returns:
+            the record with a float value and int index, or None if unreadable
+        """
+        try:
+            record = json.loads(line)
+            record["value"] = float(record["value"])
+            record["index"] = int(record["index"])
+        except (ValueError, KeyError, TypeError):
+            return None
+        return record if math.isfinite(record["value"]) else None
+
+    def _quarantine(self, line, offset):
+        """
+        Copy an unreadable record into a side file; the log itself stays append-only.
+
+        Entries are keyed by the log's inode and the record's byte offset,
+        so a record every process reads again on open is only copied once.
+        """
+        key = f"{self._inode}:{offset}".encode()
+        with open(self.path.with_suffix(".quarantine"), "a+b") as f, _flock(f.fileno()):
+            f.seek(0)
+            if any(entry.split(b"\t", 1)[0] == key for entry in f):
+                return
+            f.write(key + b"\t" + line + b"\n")
+        metrics.QUARANTINED.inc()
+        print(f"Quarantined a record of {self.path.name}: {line[:200]!r}", file=sys.stderr)
+
+    def _ends_with_newline(self, fd):
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return True
+        with open(self.path, "rb") as f:
+            f.seek(size - 1)
+            return f.read(1) == b"\n"
+
+    @metrics.timed
+    def add_many(self, pledges):
+        """
+        Append (email, value) pairs and return the new total.
+        """
+        with self.lock, open(self.path, "a", encoding="utf-8") as f, _flock(f.fileno()):
+            # Catch up under the lock so indexes continue from other writers' records
+            self.refresh()
+            lines = []
+            if not self._ends_with_newline(f.fileno()):
+                # A writer died mid-line; end that line so ours is not glued onto
+                # it. The fragment then gets quarantined on its own.
+                lines.append("\n")
+            for index, (email, value) in enumerate(pledges, start=self._next_index):
+                record = {"index": index, "email": email, "value": float(value)}
+                lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+            f.write("".join(lines))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            self.refresh()
+            return self._total
+
+    def add(self, email, value):
+        return self.add_many([(email, value)])
+
+    def total(self):
+        with self.lock:
+            self.refresh()
+            return self._total
+
+    def count(self):
+        with self.lock:
+            self.refresh()
+            return self._count
+
+    def records(self):
+        with open(self.path, "rb") as f:
+            for line in f:
+                record = self._parse(line) if line.endswith(b"\n") else None
+                if record is not None:
+                    yield record["index"], record.get("email", ""), record["value"]
+
+class SQLiteStorage:
+    """
+    SQLite database in WAL mode with one row per normalized email.
+
+    Submitting again with the same email updates that pledge instead of
+    adding another one; pledges without an email are always added.
+    Triggers keep the total, count and amount histogram up to date, so
+    reading them is a single-row lookup.
+    """
+
+    SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS pledges (
+        id INTEGER PRIMARY KEY,
+        email TEXT UNIQUE,
+        name TEXT NOT NULL,
+        value REAL NOT NULL,
+        created REAL NOT NULL,
+        updated REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS totals (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        total REAL NOT NULL,
+        count INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO totals VALUES (0, 0, 0);
+    CREATE TABLE IF NOT EXISTS histogram (
+        bucket INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL
+    );
+    CREATE TRIGGER IF NOT EXISTS pledges_insert AFTER INSERT ON pledges BEGIN
+        UPDATE totals SET total = total + NEW.value, count = count + 1;
+        INSERT INTO histogram VALUES (CAST(NEW.value / {HISTOGRAM_BUCKET} AS INTEGER) * {HISTOGRAM_BUCKET}, 1)
+            ON CONFLICT(bucket) DO UPDATE SET count = count + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS pledges_update AFTER UPDATE OF value ON pledges BEGIN
+        UPDATE totals SET total = total - OLD.value + NEW.value;
+        UPDATE histogram SET count = count - 1
+            WHERE bucket = CAST(OLD.value / {HISTOGRAM_BUCKET} AS INTEGER) * {HISTOGRAM_BUCKET};
+        INSERT INTO histogram VALUES (CAST(NEW.value / {HISTOGRAM_BUCKET} AS INTEGER) * {HISTOGRAM_BUCKET}, 1)
+            ON CONFLICT(bucket) DO UPDATE SET count = count + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS pledges_delete AFTER DELETE ON pledges BEGIN
+        UPDATE totals SET total = total - OLD.value, count = count - 1;
+        UPDATE histogram SET count = count - 1
+            WHERE bucket = CAST(OLD.value / {HISTOGRAM_BUCKET} AS INTEGER) * {HISTOGRAM_BUCKET};
+    END;
+    """
+
+    UPSERT = """
+    INSERT INTO pledges (email, name, value, created, updated) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(email) DO UPDATE SET name = excluded.name, value = excluded.value, updated = excluded.updated
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._open()
+        try:
+            conn.executescript(self.SCHEMA)
+        finally:
+            conn.close()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _connect(self):
+        """
+        Connection for the calling thread and process, opened on first use.
+
+        A forked child's main thread inherits the parent's thread-local
+        connection, which SQLite must never use across fork(); keying by pid
+        gives the child its own. Inherited ones are kept referenced rather
+        than closed, since closing them in the child is just as unsafe.
+        """
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(os.getpid())
+        if conn is None:
+            conn = conns[os.getpid()] = self._open()
+        return conn
+
+    def close(self):
+        """
+        Close the calling thread's connection, if it has one.
+        """
+        conn = getattr(self._local, "conns", {}).pop(os.getpid(), None)
+        if conn is not None:
+            conn.close()
+
+    @metrics.timed
+    def add_many(self, pledges):
+        """
+        Store (email, value) pairs, updating earlier pledges from the same
+        email, and return the new total.
+        """
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.executemany(
+                self.UPSERT,
+                [(normalize_email(email), (email or "").strip(), float(value), now, now) for email, value in pledges],
+            )
+        return self.total()
+
+    def add(self, email, value):
+        return self.add_many([(email, value)])
+
+    def total(self):
+        return self._connect().execute("SELECT total FROM totals").fetchone()[0]
+
+    def count(self):
+        return self._connect().execute("SELECT count FROM totals").fetchone()[0]
+
+    def histogram(self):
+        """
+        Returns:
+            [(bucket_start, count)] for every non-empty HISTOGRAM_BUCKET wide bucket
+        """
+        return self._connect().execute(
+            "SELECT bucket, count FROM histogram WHERE count > 0 ORDER BY bucket"
+        ).fetchall()
+
+    def lookup(self, email):
+        """
+        Returns:
+            dict with the pledge of an email, or None
+        """
+        key = normalize_email(email)
+        if key is None:
+            return None
+        row = self._connect().execute(
+            "SELECT email, name, value, created, updated FROM pledges WHERE email = ?", (key,)
+        ).fetchone()
+        return dict(zip(("email", "name", "value", "created", "updated"), row)) if row else None
+
+    def records(self):
+        yield from self._connect().execute("SELECT id, name, value FROM pledges ORDER BY id")
+
+    def import_csv(self, path):
+        """
+        Add the rows of a CSV file with "email" and "value" columns.
+        Returns:
+            number of rows read
+        """
+        pledges = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    value = float(row["value"])
+                    if not math.isfinite(value):
+                        raise ValueError(row["value"])
+                except (KeyError, TypeError, ValueError):
+                    print(f"Skipping CSV row {row!r}", file=sys.stderr)
+                    continue
+                pledges.append((row.get("email") or "", value))
+        self.add_many(pledges)
+        return len(pledges)
+
+    def export_csv(self, path):
+        """
+        Write every pledge to a CSV file.
+        Returns:
+            number of rows written
+        """
+        rows = self._connect().execute(
+            "SELECT email, name, value, created, updated FROM pledges ORDER BY id"
+        ).fetchall()
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["email", "name", "value", "created", "updated"])
+            for email, name, value, created, updated in rows:
+                writer.writerow([
+                    email or "", name, value,
+                    time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(created)),
+                    time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(updated)),
+                ])
+        return len(rows)
+
+class SubmissionQueue:
+    """
+    Funnels submissions from all worker threads through one writer thread.
+
+    Whatever queues up while a batch is being written goes out together as
+    the next batch (one write and fsync for the log backend), and every
+    caller in the batch gets the total after it.
+    """
+
+    def __init__(self, storage, max_batch=500):
+        self.storage = storage
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pledge-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, email, value):
+        """
+        Queue a pledge.
+        Returns:
+            Future resolving to the total after it was written
+        """
+        future = Future()
+        self._ensure_started()
+        self.queue.put(((email, value), future))
+        return future
+
+    def add(self, email, value, timeout=None):
+        return self.submit(email, value).result(timeout)
+
+    @metrics.timed(profile=True)
+    def _write(self, pledges):
+        # The storage work happens on this thread, so this is where to profile it
+        return self.storage.add_many(pledges)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                total = self._write([pledge for pledge, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for _, future in batch:
+                future.set_result(total)
+
+def migrate_directory_to_log(folder=OUTPUT_DIR, log_path=None):
+    """
+    Copy every pledge file in a folder into a new log, keeping the indexes'
+    order. The pledge files are left in place.
+    Returns:
+        number of records written
+    """
+    folder = Path(folder)
+    log_path = Path(log_path) if log_path else folder / LOG_NAME
+    if log_path.exists() and log_path.stat().st_size:
+        raise FileExistsError(f"{log_path} already contains pledges")
+    pledges = [(email, value) for _, email, value in iter_pledge_files(folder)]
+    # Built in full under another name, so an interrupted migration leaves
+    # no half-filled log behind that would look migrated
+    scratch = log_path.with_name(f".{log_path.name}.{os.getpid()}.tmp")
+    try:
+        LogStorage(scratch).add_many(pledges)
+        try:
+            # link() never replaces a log another process has just migrated
+            os.link(scratch, log_path)
+        except FileExistsError:
+            if log_path.stat().st_size:
+                raise FileExistsError(f"{log_path} already contains pledges") from None
+            os.replace(scratch, log_path)
+    finally:
+        scratch.unlink(missing_ok=True)
+    return len(pledges)
+
+def export_log_to_directory(log_path, folder, prefix="pledge", extension=".txt"):
+    """
+    Write every record of a log back out as {prefix}_{index}{extension}.
+    Refuses a folder that already holds pledge files, before writing any.
+    Returns:
+        number of files written
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    if any(iter_pledge_files(folder, prefix, extension)):
+        raise FileExistsError(f"{folder} already contains pledge files")
+    written = 0
+    for index, email, value in LogStorage(log_path).records():
+        with open(folder / f"{prefix}_{index}{extension}", "x", encoding="utf-8") as f:
+            f.write(format_pledge_line(email, value))
+        written += 1
+    return written
+
+def migrate_to_sqlite(folder=OUTPUT_DIR, db_path=None):
+    """
+    Create the database from the log, or from the pledge files when there
+    is no log. Nothing appears at db_path until the import is complete.
+    Returns:
+        number of pledges read, before dedup
+    """
+    folder = Path(folder)
+    db_path = Path(db_path) if db_path else folder / DB_NAME
+    log_path = folder / LOG_NAME
+    has_log = log_path.exists() and log_path.stat().st_size
+    source = LogStorage(log_path).records() if has_log else iter_pledge_files(folder)
+    # In submission order, so a later pledge from the same email wins
+    pledges = [(email, value) for _, email, value in source]
+    scratch = db_path.with_name(f".{db_path.name}.{os.getpid()}.tmp")
+    leftovers = [scratch.with_name(scratch.name + suffix) for suffix in ("", "-wal", "-shm")]
+    try:
+        for path in leftovers:
+            path.unlink(missing_ok=True)
+        database = SQLiteStorage(scratch)
+        if pledges:
+            database.add_many(pledges)
+        # Closing the last connection checkpoints the WAL into the file itself
+        database.close()
+        # link() never replaces a database another process has just created
+        os.link(scratch, db_path)
+    finally:
+        for path in leftovers:
+            path.unlink(missing_ok=True)
+    return len(pledges)
+
+def open_storage(kind=None, folder=None):
+    """
+    Storage backend selected by PLEDGE_STORAGE ("sqlite", "log" or "files").
+
+    The first time the sqlite or log backend is used on a folder, existing
+    pledges from the older layouts are migrated into it.
+    """
+    kind = kind or STORAGE_KIND
+    folder = Path(folder or OUTPUT_DIR)
+    if kind == "files":
+        return DirectoryStorage(folder)
+    if kind == "log":
+        log_path = folder / LOG_NAME
+        # An empty log may be left over from an interrupted migration
+        unmigrated = not log_path.exists() or log_path.stat().st_size == 0
+        if unmigrated and folder.is_dir() and any(iter_pledge_files(folder)):
+            try:
+                count = migrate_directory_to_log(folder, log_path)
+                print(f"Migrated {count} pledge files from {folder} into {log_path}")
+            except FileExistsError:
+                pass  # another process migrated it first
+        return LogStorage(log_path)
+    if kind == "sqlite":
+        db_path = folder / DB_NAME
+        count = 0
+        if not db_path.exists() and folder.is_dir():
+            try:
+                count = migrate_to_sqlite(folder, db_path)
+            except FileExistsError:
+                pass  # another process migrated it first
+        storage = SQLiteStorage(db_path)
+        if count:
+            print(f"Migrated {count} pledges from {folder} into {db_path} ({storage.count()} after dedup)")
+        return storage
+    raise ValueError(f"Unknown PLEDGE_STORAGE: {kind!r}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert, import and export stored pledges.")
+    parser.add_argument("command", choices=["migrate", "export", "import-csv", "export-csv", "lookup"])
+    parser.add_argument("arg", nargs="?", help="import-csv/export-csv: CSV path; lookup: email")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="folder holding the pledge files, log and database")
+    parser.add_argument("--log", help=f"log path (default: OUTPUT/{LOG_NAME})")
+    parser.add_argument("--to", help="export: empty folder to write pledge files into")
+    args = parser.parse_args()
+    log_path = args.log or Path(args.output) / LOG_NAME
+    if args.command == "migrate":
+        print(f"Migrated {migrate_directory_to_log(args.output, log_path)} pledges into {log_path}")
+    elif args.command == "export":
+        # migrate leaves the pledge files in OUTPUT, so it cannot be the default
+        if not args.to:
+            parser.error("export needs --to")
+        print(f"Exported {export_log_to_directory(log_path, args.to)} pledges into {args.to}")
+    else:
+        if not args.arg:
+            parser.error(f"{args.command} needs an argument")
+        storage = open_storage("sqlite", args.output)
+        if args.command == "import-csv":
+            print(f"Imported {storage.import_csv(args.arg)} pledges from {args.arg}")
+        elif args.command == "export-csv":
+            print(f"Exported {storage.export_csv(args.arg)} pledges into {args.arg}")
+        else:
+            print(json.dumps(storage.lookup(args.arg)))
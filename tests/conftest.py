@@ -0,0 +1,23 @@
+import importlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The modules live at the top of the repo, and main opens storage at import
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("PLEDGE_OUTPUT_DIR", tempfile.mkdtemp(prefix="pledge-tests-"))
+
+@pytest.fixture(scope="session")
+def main():
+    # main reads style.css relative to the working directory at import
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        return importlib.import_module("main")
+    finally:
+        os.chdir(cwd)
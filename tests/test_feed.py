@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+from feed import ChangeFeed
+
+class StubStorage:
+    def __init__(self, total, delay=0):
+        self.value = total
+        self.delay = delay
+
+    def total(self):
+        time.sleep(self.delay)
+        return self.value
+
+def make_feed(total=20, delay=0):
+    # A long poll interval, so only the test's own publishes change anything
+    return ChangeFeed(StubStorage(total, delay), lambda total: f"<{total}>", interval=3600)
+
+def run(coro, timeout=5):
+    """
+    Run coro on a fresh event loop in another thread, so a stream that
+    spins fails the test instead of hanging it.
+    """
+    result = []
+    thread = threading.Thread(target=lambda: result.append(asyncio.run(coro)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "stream did not yield in time"
+    return result[0]
+
+def test_first_payload_is_the_current_total():
+    feed = make_feed(20)
+
+    async def first():
+        stream = feed.stream(heartbeat=5)
+        try:
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+    assert run(first()) == "<20>"
+
+def test_first_read_does_not_block_the_event_loop():
+    feed = make_feed(20, delay=0.3)
+
+    async def ticks_during_first():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+        ticker = asyncio.create_task(tick())
+        stream = feed.stream(heartbeat=5)
+        await stream.__anext__()
+        ticker.cancel()
+        await stream.aclose()
+        return ticks
+    assert run(ticks_during_first()) >= 10
+
+def test_publish_wakes_a_waiting_subscriber():
+    feed = make_feed(20)
+
+    async def next_after_publish():
+        stream = feed.stream(heartbeat=5)
+        await stream.__anext__()
+        waiting = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        # Submissions publish from worker threads
+        threading.Thread(target=feed.publish, args=(30,)).start()
+        payload = await asyncio.wait_for(waiting, 2)
+        await stream.aclose()
+        return payload
+    assert run(next_after_publish()) == "<30>"
+
+def test_idle_stream_yields_a_heartbeat():
+    feed = make_feed(20)
+
+    async def idle():
+        stream = feed.stream(heartbeat=0.05)
+        await stream.__anext__()
+        start = time.monotonic()
+        payload = await stream.__anext__()
+        await stream.aclose()
+        return payload, time.monotonic() - start
+    payload, waited = run(idle())
+    assert payload is None
+    assert 0.04 <= waited < 2
+
+def test_stale_wake_up_does_not_spin():
+    feed = make_feed(20)
+
+    async def after_stale_wake_up():
+        stream = feed.stream(heartbeat=0.1)
+        await stream.__anext__()
+        # A wake-up for the version that was just sent, as left behind by a
+        # publish racing the previous yield
+        (_, event), = feed._subscribers
+        event.set()
+        payload = await stream.__anext__()
+        await stream.aclose()
+        return payload
+    assert run(after_stale_wake_up()) is None
@@ -0,0 +1,43 @@
+import storage
+
+def test_unreadable_pledge_file_is_moved_aside(tmp_path):
+    (tmp_path / "pledge_0.txt").write_text("a@example.com, 20", encoding="utf-8")
+    (tmp_path / "pledge_1.txt").write_text("a@example.com, lots", encoding="utf-8")
+    (tmp_path / "pledge_2.txt").write_text("b@example.com, nan", encoding="utf-8")
+
+    aggregate = storage.PledgeAggregate(tmp_path)
+    aggregate.rebuild()
+
+    assert aggregate.total == 20
+    assert sorted(p.name for p in (tmp_path / storage.QUARANTINE_DIR).iterdir()) == ["pledge_1.txt", "pledge_2.txt"]
+    assert not (tmp_path / "pledge_1.txt").exists()
+
+def test_quarantined_file_of_the_same_name_is_kept(tmp_path):
+    quarantine = tmp_path / storage.QUARANTINE_DIR
+    for content in ("first, x", "second, x", "third, x"):
+        (tmp_path / "pledge_0.txt").write_text(content, encoding="utf-8")
+        storage.PledgeAggregate(tmp_path).rebuild()
+
+    assert {p.name: p.read_text(encoding="utf-8") for p in quarantine.iterdir()} == {
+        "pledge_0.txt": "first, x",
+        "pledge_0.txt.1": "second, x",
+        "pledge_0.txt.2": "third, x",
+    }
+
+def test_unreadable_log_record_is_copied_once(tmp_path):
+    log_path = tmp_path / storage.LOG_NAME
+    log = storage.LogStorage(log_path)
+    log.add("a@example.com", 20)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write('garbage\n{"index": 1, "value": "inf"}\n')
+    assert log.add("b@example.com", 30) == 50
+
+    # Every open replays the log; the side file must not grow with it
+    for _ in range(3):
+        assert storage.LogStorage(log_path).total() == 50
+
+    entries = log_path.with_suffix(".quarantine").read_bytes().splitlines()
+    assert [entry.split(b"\t", 1)[1] for entry in entries] == [b"garbage", b'{"index": 1, "value": "inf"}']
+    # The log itself is left alone
+    assert b"garbage" in log_path.read_bytes()
+    assert [email for _, email, _ in log.records()] == ["a@example.com", "b@example.com"]
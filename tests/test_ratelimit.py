@@ -0,0 +1,43 @@
+import pytest
+
+import ratelimit
+from ratelimit import RateLimiter
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+def test_burst_then_refill(clock):
+    limiter = RateLimiter(rate=0.5, burst=3)
+    assert [limiter.allow("a") for _ in range(4)] == [True, True, True, False]
+
+    clock[0] += 1.9
+    assert not limiter.allow("a")
+    clock[0] += 0.2
+    assert limiter.allow("a")
+    assert not limiter.allow("a")
+
+    # Refilling stops at the burst size
+    clock[0] += 3600
+    assert [limiter.allow("a") for _ in range(4)] == [True, True, True, False]
+
+def test_clients_have_separate_buckets(clock):
+    limiter = RateLimiter(rate=0.1, burst=1)
+    assert limiter.allow("a")
+    assert not limiter.allow("a")
+    assert limiter.allow("b")
+
+def test_least_recently_used_client_is_dropped(clock):
+    limiter = RateLimiter(rate=0.001, burst=1, max_clients=2)
+    assert limiter.allow("a")
+    assert limiter.allow("b")
+    assert not limiter.allow("a")  # a is now the most recently used
+    assert limiter.allow("c")      # evicts b
+
+    assert list(limiter._buckets) == ["a", "c"]
+    assert not limiter.allow("a")
+    # b was forgotten, so it starts over with a full bucket
+    assert limiter.allow("b")
+    assert list(limiter._buckets) == ["a", "b"]
@@ -0,0 +1,49 @@
+import storage
+
+def open_db(tmp_path):
+    return storage.SQLiteStorage(tmp_path / storage.DB_NAME)
+
+def test_same_email_updates_the_pledge(tmp_path):
+    db = open_db(tmp_path)
+    db.add("Alice@Example.com ", 20)
+    assert db.add("alice@example.com", 120) == 120
+
+    assert db.count() == 1
+    pledge = db.lookup(" ALICE@example.COM")
+    assert pledge["email"] == "alice@example.com"
+    assert pledge["name"] == "alice@example.com"
+    assert pledge["value"] == 120
+    assert pledge["updated"] >= pledge["created"]
+
+def test_pledges_without_email_are_never_merged(tmp_path):
+    db = open_db(tmp_path)
+    db.add_many([("", 20), (None, 30), ("  ", 40)])
+
+    assert db.count() == 3
+    assert db.total() == 90
+    assert db.lookup("") is None
+
+def test_duplicates_within_one_batch_keep_the_last(tmp_path):
+    db = open_db(tmp_path)
+    assert db.add_many([("a@example.com", 20), ("b@example.com", 30), ("A@example.com", 50)]) == 80
+    assert db.count() == 2
+    assert db.lookup("a@example.com")["value"] == 50
+
+def test_histogram_follows_inserts_and_updates(tmp_path):
+    db = open_db(tmp_path)
+    db.add_many([("a@example.com", 20), ("b@example.com", 49), ("c@example.com", 75), ("", 499)])
+    assert db.histogram() == [(0, 2), (50, 1), (450, 1)]
+
+    # Moving a pledge to another bucket takes it out of the old one
+    db.add("a@example.com", 60)
+    assert db.histogram() == [(0, 1), (50, 2), (450, 1)]
+    db.add("b@example.com", 499)
+    assert db.histogram() == [(50, 2), (450, 2)]
+    assert db.total() == 60 + 499 + 75 + 499
+
+def test_totals_survive_reopening(tmp_path):
+    db = open_db(tmp_path)
+    db.add_many([("a@example.com", 20), ("a@example.com", 25), ("b@example.com", 30)])
+
+    reopened = open_db(tmp_path)
+    assert (reopened.total(), reopened.count()) == (55, 2)
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="module")
+def client(main):
+    return TestClient(main.build_app())
+
+@pytest.fixture
+def url(main):
+    return f"{main.STATIC_PATH}/longer_pixels.png"
+
+def test_static_file_is_served_with_etag_and_cache_control(main, client, url):
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content == (Path(main.__file__).parent / "longer_pixels.png").read_bytes()
+    assert response.headers["cache-control"] == "public, max-age=86400"
+    etag = response.headers["etag"]
+    assert len(etag) > 2 and etag.startswith('"') and etag.endswith('"')
+    # Stable across requests, so browsers can revalidate
+    assert client.get(url).headers["etag"] == etag
+
+def test_matching_etag_gets_not_modified(client, url):
+    etag = client.get(url).headers["etag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, max-age=86400"
+
+def test_stale_etag_gets_the_file_again(client, url):
+    response = client.get(url, headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.content
@@ -0,0 +1,200 @@
+import os
+import threading
+
+import pytest
+
+import storage
+
+class GatedStorage:
+    """
+    Backend whose first write blocks until released, so submissions pile up behind it.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.total = 0.0
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def add_many(self, pledges):
+        self.writing.set()
+        self.release.wait(10)
+        self.batches.append(list(pledges))
+        self.total += sum(value for _, value in pledges)
+        return self.total
+
+def test_submission_queue_batches_what_queues_up():
+    backend = GatedStorage()
+    submissions = storage.SubmissionQueue(backend, max_batch=20)
+    first = submissions.submit("first@example.com", 1)
+    assert backend.writing.wait(10)
+    rest = [submissions.submit(f"p{i}@example.com", 1) for i in range(50)]
+    backend.release.set()
+
+    assert first.result(10) == 1
+    assert [f.result(10) for f in rest] == [21] * 20 + [41] * 20 + [51] * 10
+    assert [len(batch) for batch in backend.batches] == [1, 20, 20, 10]
+    assert [email for batch in backend.batches for email, _ in batch] == (
+        ["first@example.com"] + [f"p{i}@example.com" for i in range(50)]
+    )
+
+@pytest.mark.parametrize("kind", ["files", "log", "sqlite"])
+def test_submission_queue_keeps_every_concurrent_pledge(tmp_path, kind):
+    backend = storage.open_storage(kind, tmp_path)
+    submissions = storage.SubmissionQueue(backend)
+    threads, per_thread = 8, 25
+    totals = [[] for _ in range(threads)]
+
+    def submit_many(n):
+        for i in range(per_thread):
+            totals[n].append(submissions.add(f"t{n}-{i}@example.com", 20))
+
+    workers = [threading.Thread(target=submit_many, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    expected = threads * per_thread * 20.0
+    assert backend.total() == expected
+    assert backend.count() == threads * per_thread
+    for returned in totals:
+        # Each caller sees a total that includes its own pledge, and never goes down
+        assert returned == sorted(returned)
+        assert 20 <= returned[0] and returned[-1] <= expected
+    assert max(t for returned in totals for t in returned) == expected
+
+def test_save_indexed_texts_skips_an_index_taken_behind_its_back(tmp_path):
+    storage.save_indexed_texts(["a@example.com, 20"], tmp_path)
+    before = tmp_path.stat()
+    (tmp_path / "pledge_1.txt").write_text("outside@example.com, 30", encoding="utf-8")
+    # Hide the new file from the aggregate's mtime check
+    os.utime(tmp_path, ns=(before.st_atime_ns, before.st_mtime_ns))
+
+    storage.save_indexed_texts(["b@example.com, 40"], tmp_path)
+
+    assert (tmp_path / "pledge_1.txt").read_text(encoding="utf-8") == "outside@example.com, 30"
+    assert (tmp_path / "pledge_2.txt").read_text(encoding="utf-8") == "b@example.com, 40"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["pledge_0.txt", "pledge_1.txt", "pledge_2.txt"]
+
+def test_aggregate_counts_files_added_and_removed_out_of_band(tmp_path):
+    storage.save_indexed_texts(["a@example.com, 20"], tmp_path)
+    aggregate = storage.get_aggregate(tmp_path)
+    assert aggregate.current_total() == 20
+
+    (tmp_path / "pledge_1.txt").write_text("outside@example.com, 30", encoding="utf-8")
+    assert (aggregate.current_total(), aggregate.count, aggregate.max_index) == (50, 2, 1)
+
+    (tmp_path / "pledge_0.txt").unlink()
+    assert (aggregate.current_total(), aggregate.count) == (30, 1)
+
+    # Our own writes continue after the out-of-band index
+    storage.save_indexed_texts(["b@example.com, 40"], tmp_path)
+    assert aggregate.current_total() == 70
+    assert (tmp_path / "pledge_2.txt").exists()
+
+def test_aggregate_picks_up_an_empty_file_filled_in_later(tmp_path):
+    storage.save_indexed_texts(["a@example.com, 20"], tmp_path)
+    aggregate = storage.get_aggregate(tmp_path)
+    pledge = tmp_path / "pledge_1.txt"
+    pledge.touch()
+    assert aggregate.current_total() == 20
+
+    # Filling a file in does not change the folder mtime
+    before = pledge.stat()
+    pledge.write_text("late@example.com, 30", encoding="utf-8")
+    os.utime(pledge, ns=(before.st_atime_ns, before.st_mtime_ns + 1))
+    assert (aggregate.current_total(), aggregate.count) == (50, 2)
+
+def test_log_append_after_a_torn_write_keeps_the_new_pledge(tmp_path):
+    log_path = tmp_path / storage.LOG_NAME
+    log = storage.LogStorage(log_path)
+    log.add("a@example.com", 20)
+    # A writer that died halfway through its line
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write('{"index": 1, "email": "b@ex')
+
+    assert log.add("c@example.com", 30) == 50
+    assert log.count() == 2
+    assert [email for _, email, _ in log.records()] == ["a@example.com", "c@example.com"]
+    assert log_path.with_suffix(".quarantine").read_bytes().endswith(b'\t{"index": 1, "email": "b@ex\n')
+    reopened = storage.LogStorage(log_path)
+    assert (reopened.total(), reopened.count()) == (50, 2)
+
+def seed_files(folder, values):
+    for index, value in enumerate(values):
+        (folder / f"pledge_{index}.txt").write_text(f"p{index}@example.com, {value}", encoding="utf-8")
+
+def test_open_storage_migrates_pledge_files_into_the_log(tmp_path):
+    seed_files(tmp_path, [20, 30, 40])
+
+    log = storage.open_storage("log", tmp_path)
+    assert (log.total(), log.count()) == (90, 3)
+    assert [email for _, email, _ in log.records()] == ["p0@example.com", "p1@example.com", "p2@example.com"]
+    assert log.add("new@example.com", 10) == 100
+
+    # Migrated once: reopening does not copy the files again
+    assert storage.open_storage("log", tmp_path).total() == 100
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([
+        storage.LOG_NAME, "pledge_0.txt", "pledge_1.txt", "pledge_2.txt",
+    ])
+
+def test_interrupted_log_migration_is_redone(tmp_path):
+    seed_files(tmp_path, [20, 30])
+    # What an older, non-atomic migration left behind when it was killed
+    (tmp_path / storage.LOG_NAME).touch()
+
+    assert storage.open_storage("log", tmp_path).total() == 50
+
+def test_log_export_round_trips_the_pledge_files(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "export"
+    source.mkdir()
+    seed_files(source, [20, 35.5, 40])
+    (source / "pledge_3.txt").write_text("", encoding="utf-8")
+    (source / "pledge_7.txt").write_text("late@example.com, 15", encoding="utf-8")
+
+    assert storage.migrate_directory_to_log(source) == 4
+    assert storage.export_log_to_directory(source / storage.LOG_NAME, target) == 4
+
+    exported = {p.name: p.read_text(encoding="utf-8") for p in target.iterdir()}
+    assert exported == {
+        f"pledge_{index}.txt": text
+        for index, text in enumerate([
+            "p0@example.com, 20.0", "p1@example.com, 35.5", "p2@example.com, 40.0", "late@example.com, 15.0",
+        ])
+    }
+    assert list(storage.iter_pledge_files(target)) == [
+        (0, "p0@example.com", 20), (1, "p1@example.com", 35.5), (2, "p2@example.com", 40), (3, "late@example.com", 15),
+    ]
+
+def test_log_export_refuses_a_folder_with_pledge_files(tmp_path):
+    seed_files(tmp_path, [20, 30])
+    storage.migrate_directory_to_log(tmp_path)
+
+    with pytest.raises(FileExistsError):
+        storage.export_log_to_directory(tmp_path / storage.LOG_NAME, tmp_path)
+    assert sorted(p.name for p in tmp_path.glob("pledge_*.txt")) == ["pledge_0.txt", "pledge_1.txt"]
+
+def test_open_storage_migrates_the_log_into_sqlite(tmp_path):
+    log = storage.LogStorage(tmp_path / storage.LOG_NAME)
+    log.add_many([("a@example.com", 20), ("b@example.com", 30), ("A@example.com", 50)])
+
+    database = storage.open_storage("sqlite", tmp_path)
+    assert (database.total(), database.count()) == (80, 2)
+    database.add("c@example.com", 20)
+    assert storage.open_storage("sqlite", tmp_path).total() == 100
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith(".")) == []
+
+def test_interrupted_sqlite_migration_is_redone(tmp_path, monkeypatch):
+    seed_files(tmp_path, [20, 30])
+
+    def killed(self, pledges):
+        raise KeyboardInterrupt
+    with monkeypatch.context() as patch:
+        patch.setattr(storage.SQLiteStorage, "add_many", killed)
+        with pytest.raises(KeyboardInterrupt):
+            storage.open_storage("sqlite", tmp_path)
+    assert not (tmp_path / storage.DB_NAME).exists()
+
+    database = storage.open_storage("sqlite", tmp_path)
+    assert (database.total(), database.count()) == (50, 2)
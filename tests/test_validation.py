@@ -0,0 +1,53 @@
+import math
+from types import SimpleNamespace
+
+import gradio as gr
+import pytest
+
+@pytest.mark.parametrize("name, slider, expected", [
+    ("", 20, ("", 20.0)),
+    (None, "15", ("", 15.0)),
+    ("  pledger@example.com ", 500, ("pledger@example.com", 500.0)),
+    ("first.last+tag@sub.example.fi", 99.5, ("first.last+tag@sub.example.fi", 99.5)),
+])
+def test_clean_pledge_accepts(main, name, slider, expected):
+    assert main.clean_pledge(name, slider) == expected
+
+@pytest.mark.parametrize("name", [
+    "not-an-email",
+    "two@@example.com",
+    "no-dot@example",
+    "with space@example.com",
+    "comma,in@example.com",
+    "new\nline@example.com",
+    "a@b.c, 999",
+    "x" * 250 + "@example.com",
+])
+def test_clean_pledge_rejects_emails(main, name):
+    with pytest.raises(gr.Error):
+        main.clean_pledge(name, 20)
+
+@pytest.mark.parametrize("slider", [14.99, 500.01, -20, 0, None, "abc", math.nan, math.inf, "1e9"])
+def test_clean_pledge_rejects_amounts(main, slider):
+    with pytest.raises(gr.Error):
+        main.clean_pledge("", slider)
+
+def fake_request(forwarded=None, host="10.0.0.1"):
+    headers = {"x-forwarded-for": forwarded} if forwarded is not None else {}
+    return SimpleNamespace(headers=headers, client=SimpleNamespace(host=host), session_hash="session")
+
+def test_client_key_ignores_forwarded_for_without_a_proxy(main, monkeypatch):
+    monkeypatch.setattr(main, "TRUST_PROXY", 0)
+    assert main.client_key(fake_request("1.2.3.4")) == "10.0.0.1"
+
+def test_client_key_uses_the_hop_the_proxy_appended(main, monkeypatch):
+    monkeypatch.setattr(main, "TRUST_PROXY", 1)
+    # The client made up the first entry; the proxy appended the last
+    assert main.client_key(fake_request("6.6.6.6, 1.2.3.4")) == "1.2.3.4"
+    assert main.client_key(fake_request("1.2.3.4")) == "1.2.3.4"
+    assert main.client_key(fake_request()) == "10.0.0.1"
+
+    monkeypatch.setattr(main, "TRUST_PROXY", 2)
+    assert main.client_key(fake_request("6.6.6.6, 1.2.3.4, 10.0.0.9")) == "1.2.3.4"
+    # Fewer hops than proxies: the header cannot be trusted
+    assert main.client_key(fake_request("1.2.3.4")) == "10.0.0.1"